@@ -1,7 +1,7 @@
 # -*- coding: UTF-8 -*-
 
 # from pyrevit import HOST_APP
-# from pyrevit import revit
+from pyrevit import revit
 # from pyrevit import DB, UI
 from pyrevit import forms
 
@@ -11,7 +11,7 @@ from pyrevit import forms
 # from pyrevit.revit.db.transaction import Transaction
 # from pyrevit.revit import create
 # from pyrevit import script
-# from pyrevit import EXEC_PARAMS
+from pyrevit import EXEC_PARAMS
 # from rpws import RevitServer
 # import os
 # import json
@@ -19,6 +19,10 @@ from pyrevit import forms
 # import re
 # import sys
 
+# The image and SVG snippets below import numpy, OpenCV and friends inside the
+# functions that use them, so clicking the button only pays for pyRevit. Set
+# this to run their examples as well.
+RUN_EXAMPLES = False
 
 # create a python function to extract a vector outline from a black and white image
 
@@ -39,12 +43,12 @@ pip install opencv-python-headless numpy svgwrite
 Now, here's the Python function to extract a vector outline from a black 
 and white image:
 """
-import cv2
-import numpy as np
-import svgwrite
 
 
 def extract_vector_outline(image_path, output_svg_path):
+    import cv2
+    import svgwrite
+
     # Load the image
     image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
 
@@ -73,7 +77,8 @@ def extract_vector_outline(image_path, output_svg_path):
 
 
 # Example usage
-extract_vector_outline("input_image.png", "output_vector.svg")
+if RUN_EXAMPLES:
+    extract_vector_outline("input_image.png", "output_vector.svg")
 """
 ### Explanation:
 1. **Loading the Image**: The function reads the image in grayscale mode 
@@ -107,11 +112,12 @@ arrays. The process typically involves the following steps:
 Here's a simple implementation of these steps:
 
 """
-import cv2
-import numpy as np
 
 
 def extract_vector_outline(image_path, output_path):
+    import cv2
+    import numpy as np
+
     # Load the image
     image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
 
@@ -141,7 +147,7 @@ def extract_vector_outline(image_path, output_path):
 
 
 # Example usage
-if __name__ == "__main__":
+if RUN_EXAMPLES:
     input_image_path = "path_to_your_image.jpg"
     output_image_path = "output_vector_outline.png"
 
@@ -185,7 +191,114 @@ import numpy as np
 """
 
 
-def flood_fill(image, start_point, target_color=None):
+def _make_flood_fill_core(connectivity):
+    # Build a kernel with the neighbourhood fixed when it is compiled, so the
+    # inner loops never test the connectivity
+    import numpy as np
+
+    try:
+        from numba import njit
+    except ImportError:
+        # numba is optional, without it the kernel runs as plain Python
+        def njit(*args, **kwargs):
+            return lambda func: func
+
+    reach = 1 if connectivity == 8 else 0
+
+    @njit(cache=True, nogil=True)
+    def flood_fill_core(matches, mask, sx, sy):
+        """Scanline fill of mask from (sx, sy) over the True pixels of matches."""
+        height, width = mask.shape
+
+        # Fill the whole run along the row in one go and only seed the rows
+        # above and below where a new run of matching pixels starts. Seeds are
+        # processed breadth first so the frontier stays a thin band of
+        # neighbouring rows rather than a deep stack on thin or diagonal shapes.
+        # The queue is a pair of int arrays rather than a list of tuples, so a
+        # push is a plain integer store.
+        xs = np.empty(64, np.int64)
+        ys = np.empty(64, np.int64)
+        xs[0] = sx
+        ys[0] = sy
+        head = 0
+        tail = 1
+        while head < tail:
+            x = xs[head]
+            y = ys[head]
+            head += 1
+            if mask[x, y] or not matches[x, y]:
+                continue
+
+            # Extend the run left and right
+            y1 = y
+            while y1 > 0 and matches[x, y1 - 1] and not mask[x, y1 - 1]:
+                y1 -= 1
+            y2 = y
+            while y2 < width - 1 and matches[x, y2 + 1] and not mask[x, y2 + 1]:
+                y2 += 1
+            mask[x, y1 : y2 + 1] = True
+
+            # Seed the adjacent rows, one seed per run, reaching one pixel
+            # past the run's ends for diagonal neighbours
+            lo = max(y1 - reach, 0)
+            hi = min(y2 + reach, width - 1)
+            for nx in (x - 1, x + 1):
+                if nx < 0 or nx >= height:
+                    continue
+                in_run = False
+                for ny in range(lo, hi + 1):
+                    if matches[nx, ny] and not mask[nx, ny]:
+                        if not in_run:
+                            if tail == xs.shape[0]:
+                                # Drop the seeds already processed and double the
+                                # queue if it is still more than half full
+                                pending = tail - head
+                                xs[:pending] = xs[head:tail].copy()
+                                ys[:pending] = ys[head:tail].copy()
+                                head = 0
+                                tail = pending
+                                if pending * 2 > xs.shape[0]:
+                                    xs = np.concatenate((xs, np.empty_like(xs)))
+                                    ys = np.concatenate((ys, np.empty_like(ys)))
+                            xs[tail] = nx
+                            ys[tail] = ny
+                            tail += 1
+                        in_run = True
+                    else:
+                        in_run = False
+
+    return flood_fill_core
+
+
+# Kernels per connectivity, built on first use
+_FLOOD_FILL_CORES = {}
+
+
+def _get_flood_fill_core(connectivity):
+    core = _FLOOD_FILL_CORES.get(connectivity)
+    if core is None:
+        core = _FLOOD_FILL_CORES[connectivity] = _make_flood_fill_core(connectivity)
+    return core
+
+
+# Image types cv2.floodFill handles natively
+_CV2_FILL_DTYPES = ("uint8", "float32")
+_CV2_FILL_CHANNELS = (1, 3)
+
+
+def _flood_fill_cv2(image, mask, x, y, connectivity):
+    # Let OpenCV fill only its bordered mask, leaving the image untouched
+    import cv2
+    import numpy as np
+
+    height, width = image.shape[:2]
+    filled = np.zeros((height + 2, width + 2), np.uint8)
+    flags = connectivity | cv2.FLOODFILL_FIXED_RANGE | cv2.FLOODFILL_MASK_ONLY | (1 << 8)
+    cv2.floodFill(np.ascontiguousarray(image), filled, (y, x), 0, 0, 0, flags)
+    mask[...] = filled[1:-1, 1:-1]
+
+
+def flood_fill(image, start_point, target_color=None, out=None, connectivity=4):
     """
     Perform a flood fill on the image starting from the start_point.
 
@@ -194,47 +307,100 @@ def flood_fill(image, start_point, target_color=None):
         start_point (tuple): The (x, y) coordinates to start the flood fill.
         target_color (int or tuple): The color to fill with. If None, it 
             will fill with the color of the start point.
+        out (numpy.ndarray): Optional bool mask of shape image.shape[:2] 
+            to reuse between calls instead of allocating a new one. It is 
+            cleared before filling.
+        connectivity (int): 4 to fill across edges only, 8 to also fill 
+            across corners.
 
     Returns:
         numpy.ndarray: A mask indicating the filled area.
     """
-    # Get the dimensions of the image
-    height, width = image.shape[:2]
+    import numpy as np
 
     # Get the color at the start point
     x, y = start_point
+    seed_color = image[x, y]
     if target_color is None:
-        target_color = image[x, y]
+        target_color = seed_color
 
     # Create a mask to keep track of the filled areas
-    mask = np.zeros_like(image, dtype=bool)
+    if out is None:
+        mask = np.zeros(image.shape[:2], dtype=bool)
+    else:
+        mask = out
+        mask.fill(False)
+
+    # Hand the fill to OpenCV's native scanline fill where it supports the
+    # image, which needs the fill to start on a pixel of the target color
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    if (
+        image.dtype.name in _CV2_FILL_DTYPES
+        and channels in _CV2_FILL_CHANNELS
+        and np.array_equal(seed_color, target_color)
+    ):
+        _flood_fill_cv2(image, mask, x, y, connectivity)
+        return mask
+
+    # Compare against the target color once for the whole image so the fill
+    # only tests a boolean per pixel
+    target = np.asarray(target_color, dtype=image.dtype)
+    if image.ndim == 2:
+        matches = image == target
+    else:
+        # Compare one channel plane at a time into a single bool plane rather
+        # than building an (height, width, channels) temporary and reducing it
+        target = np.broadcast_to(target, (channels,))
+        matches = image[..., 0] == target[0]
+        channel_matches = np.empty_like(matches)
+        for c in range(1, channels):
+            np.equal(image[..., c], target[c], out=channel_matches)
+            matches &= channel_matches
+    _get_flood_fill_core(connectivity)(matches, mask, x, y)
 
-    # Define the flood fill function
-    def fill(x, y):
-        # Check if the current position is out of bounds
-        if x < 0 or x >= height or y < 0 or y >= width:
-            return
-        # Check if the current position is already filled or not the target color
-        if mask[x, y] or not np.array_equal(image[x, y], target_color):
-            return
+    return mask
 
-        # Fill the current position
-        mask[x, y] = True
 
-        # Recursively fill in all four directions
-        fill(x + 1, y)  # Down
-        fill(x - 1, y)  # Up
-        fill(x, y + 1)  # Right
-        fill(x, y - 1)  # Left
+# Below this many pixels a fill is too quick to be worth handing to a thread
+PARALLEL_FILL_MIN_PIXELS = 256 * 256
 
-    # Start the flood fill
-    fill(x, y)
 
-    return mask
+def flood_fill_many(
+    image, start_points, target_color=None, connectivity=4, max_workers=None
+):
+    """
+    Perform independent flood fills on the image from several start points.
+
+    The fills only read the image, so on larger images they run on a thread 
+    pool; cv2.floodFill and the numba compiled kernel release the GIL while 
+    filling.
+
+    Parameters:
+        image (numpy.ndarray): The input image.
+        start_points (list): The (x, y) coordinates to start each fill.
+        target_color (int or tuple): As for flood_fill.
+        connectivity (int): As for flood_fill.
+        max_workers (int): Thread pool size, defaults to the executor's.
+
+    Returns:
+        list: One mask per start point, in the same order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def fill(start_point):
+        return flood_fill(image, start_point, target_color, connectivity=connectivity)
+
+    height, width = image.shape[:2]
+    if len(start_points) < 2 or height * width < PARALLEL_FILL_MIN_PIXELS:
+        return [fill(start_point) for start_point in start_points]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fill, start_points))
 
 
 # Example usage
-if __name__ == "__main__":
+if RUN_EXAMPLES:
+    import numpy as np
+
     # Create a sample image (3x3 with different colors)
     image = np.array([[1, 1, 0], [1, 0, 0], [0, 0, 0]])
 
@@ -250,18 +416,21 @@ if __name__ == "__main__":
 ### Explanation:
 - The `flood_fill` function initializes the flood fill process by checking 
 the color of the starting point.
-- It uses a nested `fill` function to perform the recursive filling. It 
-checks boundaries and whether the pixel has already been filled or matches 
-the target color.
+- It uses an iterative scanline fill: each seed is extended left and right 
+into a run that is filled with a single slice assignment, then one seed is 
+pushed for every run of matching pixels in the rows above and below.
+- 8 bit and float32 images with 1 or 3 channels are filled by OpenCV's 
+`cv2.floodFill` with `FLOODFILL_MASK_ONLY`, so only the mask is written.
+- Other images use a scanline kernel, which is compiled with numba when it 
+is installed and runs as plain Python otherwise. There is one kernel per 
+connectivity (4 or 8) so the neighbourhood is fixed at compile time.
 - The mask is a boolean array of the same shape as the input image, where 
 `True` indicates a filled pixel.
 
 ### Note:
-- The function assumes that the input image is in a format that can be 
-represented as a 2D array (e.g., grayscale or binary). If working with 
-colored images, you might need to adapt the color comparison accordingly.
-- For large images or deep recursion, consider implementing an iterative 
-approach to avoid stack overflow issues.
+- The image is compared against the target color in one vectorized pass, 
+so grayscale and colored images are handled alike.
+- The fill is iterative, so large regions do not hit the recursion limit.
 
 Creating a paint fill (also known as flood fill) algorithm in Python can be 
 accomplished using various libraries, such as OpenCV or PIL (Pillow). Below 
@@ -279,60 +448,68 @@ pip install opencv-python
 Here's the code for the flood fill function:
 
 """
-import cv2
-import numpy as np
-
-
-def flood_fill(image_path, point, fill_color):
-    # Read the image
-    image = cv2.imread(image_path)
-
-    # Check if the image is loaded
-    if image is None:
-        print("Error: Could not read the image.")
-        return None
 
-    # Convert the fill color from RGB to BGR (OpenCV uses BGR format)
-    fill_color = (
-        fill_color[2],
-        fill_color[1],
-        fill_color[0],
-    )  # Convert from RGB to BGR
 
-    # Get the coordinates of the point
-    x, y = point
+def flood_fill_array(bgr, seed, fill_bgr, lo=0, hi=0, flags=None, mask=None):
+    """
+    Flood fill a decoded BGR image in place from the seed point.
 
-    # Perform the flood fill operation
-    # Use the flags cv2.FLOODFILL_MASK_ONLY to create a mask
-    mask = np.zeros((image.shape[0] + 2, image.shape[1] + 2), np.uint8)
-    cv2.floodFill(image, mask, (x, y), fill_color)
+    Parameters:
+        bgr (numpy.ndarray): The image to fill, modified in place.
+        seed (tuple): The (x, y) pixel coordinates to start the fill.
+        fill_bgr (tuple): The fill color in BGR order (OpenCV uses BGR).
+        lo, hi (int or tuple): Lower and upper color difference allowed.
+        flags (int): Connectivity and cv2.FLOODFILL_* flags, defaults to 
+            4 connected with cv2.FLOODFILL_FIXED_RANGE.
+        mask (numpy.ndarray): Optional (h + 2, w + 2) uint8 mask to reuse
+            between calls, it is cleared before filling.
 
-    # Save or display the result
-    cv2.imshow("Flood Fill Result", image)
-    cv2.waitKey(0)
-    cv2.destroyAllWindows()
+    Returns:
+        numpy.ndarray: The filled image.
+    """
+    import cv2
+    import numpy as np
 
-    return image
+    if flags is None:
+        flags = 4 | cv2.FLOODFILL_FIXED_RANGE
+    if mask is None:
+        mask = np.zeros((bgr.shape[0] + 2, bgr.shape[1] + 2), np.uint8)
+    else:
+        mask.fill(0)
+    cv2.floodFill(bgr, mask, seed, fill_bgr, lo, hi, flags)
+    return bgr
 
 
 # Example usage
-if __name__ == "__main__":
+if RUN_EXAMPLES:
+    import cv2
+
     image_path = "path/to/your/image.jpg"  # Specify the path to your image
     point = (100, 100)  # Specify the point (x, y) where the flood fill should start
     fill_color = (255, 0, 0)  # Specify the fill color in RGB (red in this case)
 
-    flood_fill(image_path, point, fill_color)
+    # Reading and displaying the image is left to the caller
+    image = cv2.imread(image_path)
+    if image is None:
+        print("Error: Could not read the image.")
+    else:
+        # Convert the fill color from RGB to BGR
+        flood_fill_array(image, point, fill_color[::-1])
+        cv2.imshow("Flood Fill Result", image)
+        cv2.waitKey(0)
+        cv2.destroyAllWindows()
 """
 
 ### Explanation:
-- **Image Loading**: The function reads an image from the specified path 
-using `cv2.imread`.
-- **Fill Color**: The fill color is converted from RGB to BGR since OpenCV 
-uses the BGR format.
+- **Decoded Input**: `flood_fill_array` takes an already decoded image, so 
+callers that already hold the pixels skip the `cv2.imread` round trip.
+- **Fill Color**: The fill color is given in BGR since OpenCV uses the BGR 
+format; the example converts from RGB.
 - **Flood Fill**: The `cv2.floodFill` function is used to fill the area 
-starting from the specified point. It creates a mask to manage the area 
-that will be filled.
-- **Display**: The resulting image is displayed in a window.
+starting from the specified point. A mask can be passed in and is reused 
+between calls instead of being allocated every time.
+- **Display**: The function never opens a window, the example usage shows 
+the result itself.
 
 ### Usage:
 - Replace `'path/to/your/image.jpg'` with the path to your image file.
@@ -368,85 +545,154 @@ path coordinates. Ensure you have it installed.
    Here is a complete script to create a filled region from an SVG outline:
 
 """
-import clr
 
-clr.AddReference("RevitAPI")
-clr.AddReference("RevitServices")
-clr.AddReference("RevitNodes")
-clr.AddReference("RevitAPIUI")
-clr.AddReference("Revit")
-clr.AddReference("System")
 
-from Autodesk.Revit.DB import *
-from RevitServices.Persistence import DocumentManager
-from RevitServices.Transactions import TransactionManager
-from svgpathtools import svg2paths
-from System.Collections.Generic import List
-import os
+# Default filled region type id per document, so repeated fills skip the
+# document scan
+_frt_cache = {}
+
+
+def _get_default_frt_id(doc):
+    from Autodesk.Revit.DB import FilledRegionType, FilteredElementCollector
 
-# Get the current document
-doc = DocumentManager.Instance.CurrentDBDocument
+    key = doc.GetHashCode()
+    frt_id = _frt_cache.get(key)
+    if frt_id is None:
+        frt_id = (
+            FilteredElementCollector(doc).OfClass(FilledRegionType).FirstElementId()
+        )
+        _frt_cache[key] = frt_id
+    return frt_id
 
-# Load the SVG file and extract paths
-svg_file_path = r"path_to_your_svg_file.svg"
-paths, attributes = svg2paths(svg_file_path)
+
+def _beziers_to_nurbs(control_points, count):
+    # Join count consecutive cubic Beziers (3 * count + 1 control points) into
+    # one degree 3 NURBS. Clamped end knots and interior knots of multiplicity
+    # 3 make every span exactly the Bezier it came from.
+    import numpy as np
+    from Autodesk.Revit.DB import NurbSpline
+    from System.Collections.Generic import List
+
+    knots = np.concatenate(
+        ([0.0], np.repeat(np.arange(count + 1, dtype=float), 3), [float(count)])
+    )
+    return NurbSpline.CreateCurve(3, List[float](knots.tolist()), control_points)
 
 
 # Function to convert SVG path to Revit CurveArray
 def convert_svg_to_revit_curves(svg_path, scale=1.0):
+    import numpy as np
+    import svgpathtools
+    from Autodesk.Revit.DB import Curve, Line, XYZ
+    from System.Collections.Generic import List
+
     curves = List[Curve]()
-    for segment in svg_path:
-        start = XYZ(segment.start.real * scale, segment.start.imag * scale, 0)
-        end = XYZ(segment.end.real * scale, segment.end.imag * scale, 0)
-        if isinstance(segment, svgpathtools.Line):
+
+    # Collect and scale all the segment end points in one vectorized step so
+    # the loop below only builds the Revit geometry
+    n = len(svg_path)
+    starts = np.fromiter((segment.start for segment in svg_path), complex, n) * scale
+    ends = np.fromiter((segment.end for segment in svg_path), complex, n) * scale
+
+    # Runs of connected cubic Beziers are gathered and built as one NURBS
+    bezier_points = List[XYZ]()
+    bezier_count = 0
+    bezier_end = None
+
+    for segment, start_pt, end_pt in zip(svg_path, starts.tolist(), ends.tolist()):
+        start = XYZ(start_pt.real, start_pt.imag, 0)
+        end = XYZ(end_pt.real, end_pt.imag, 0)
+        segment_type = type(segment)
+
+        # Any other segment or a gap in the path ends the current run
+        if bezier_count and (
+            segment_type is not svgpathtools.CubicBezier or start_pt != bezier_end
+        ):
+            curves.Add(_beziers_to_nurbs(bezier_points, bezier_count))
+            bezier_points = List[XYZ]()
+            bezier_count = 0
+
+        if segment_type is svgpathtools.Line:
             line = Line.CreateBound(start, end)
             curves.Add(line)
-        elif isinstance(segment, svgpathtools.CubicBezier):
-            control1 = XYZ(
-                segment.control1.real * scale, segment.control1.imag * scale, 0
-            )
-            control2 = XYZ(
-                segment.control2.real * scale, segment.control2.imag * scale, 0
-            )
-            bezier = HermiteSpline.Create([start, control1, control2, end], False)
-            curves.Add(bezier)
+        elif segment_type is svgpathtools.CubicBezier:
+            # Bezier control points are not on the curve, so they are used as
+            # NURBS control points rather than as points to pass through
+            control1 = segment.control1 * scale
+            control2 = segment.control2 * scale
+            if not bezier_count:
+                bezier_points.Add(start)
+            bezier_points.Add(XYZ(control1.real, control1.imag, 0))
+            bezier_points.Add(XYZ(control2.real, control2.imag, 0))
+            bezier_points.Add(end)
+            bezier_count += 1
+            bezier_end = end_pt
+
+    if bezier_count:
+        curves.Add(_beziers_to_nurbs(bezier_points, bezier_count))
     return curves
 
 
-# Convert the first path to Revit curves
-if paths:
-    revit_curves = convert_svg_to_revit_curves(paths[0])
+def create_filled_regions_from_svg(svg_file_path):
+    import clr
+
+    clr.AddReference("RevitAPI")
+    clr.AddReference("RevitServices")
+    clr.AddReference("RevitNodes")
+    clr.AddReference("RevitAPIUI")
+    clr.AddReference("Revit")
+    clr.AddReference("System")
+
+    from Autodesk.Revit.DB import CurveLoop, FilledRegion
+    from RevitServices.Persistence import DocumentManager
+    from RevitServices.Transactions import TransactionManager
+    from svgpathtools import svg2paths
+    from System.Collections.Generic import List
+
+    # Get the current document
+    doc = DocumentManager.Instance.CurrentDBDocument
 
-# Create a filled region in Revit
-TransactionManager.Instance.EnsureInTransaction(doc)
+    # Load the SVG file and extract paths
+    paths, attributes = svg2paths(svg_file_path)
 
-filled_region_type = (
-    FilteredElementCollector(doc).OfClass(FilledRegionType).FirstElement()
-)
-view = doc.ActiveView
-new_filled_region = FilledRegion.Create(
-    doc, filled_region_type.Id, view.Id, revit_curves
-)
+    # Create a filled region in Revit for every path, all in one transaction
+    # so Revit only commits and regenerates once
+    filled_region_type_id = _get_default_frt_id(doc)
+    view_id = doc.ActiveView.Id
 
-TransactionManager.Instance.TransactionTaskDone()
+    TransactionManager.Instance.EnsureInTransaction(doc)
+    try:
+        for path in paths:
+            revit_curves = convert_svg_to_revit_curves(path)
+            boundary = List[CurveLoop]([CurveLoop.Create(revit_curves)])
+            FilledRegion.Create(doc, filled_region_type_id, view_id, boundary)
+    finally:
+        TransactionManager.Instance.TransactionTaskDone()
 
-print("Filled region created from SVG outline.")
+    print("{} filled regions created from SVG outline.".format(len(paths)))
+
+
+if RUN_EXAMPLES:
+    create_filled_regions_from_svg(r"path_to_your_svg_file.svg")
 """
 
 ### Important Points:
 - **Path Parsing**: This script uses the `svgpathtools` library to parse 
 the SVG file and extract path data.
 - **Coordinate Conversion**: The `convert_svg_to_revit_curves` function 
-converts each SVG segment to a Revit curve.
-- **Transaction Management**: Transactions are used to ensure safe and 
-atomic operations in Revit.
+converts each SVG line to a Revit line and each run of connected cubic 
+Bezier segments to a single degree 3 `NurbSpline` using the Bezier control 
+points.
+- **Transaction Management**: All the filled regions are created inside a 
+single transaction, so Revit commits and regenerates once however many 
+paths the SVG has.
 - **Filled Region Type**: The script retrieves a filled region type from 
-the document; you may need to adjust this to match your specific 
-requirements.
+the document once and caches its id per document; you may need to adjust 
+this to match your specific requirements.
 
 ### How to Run:
 1. Save this script in the pyRevit `extensions` directory.
-2. Change the `svg_file_path` to the path of your SVG file.
+2. Pass the path of your SVG file to `create_filled_regions_from_svg`.
 3. Load the script into Revit through pyRevit and run it.
 
 This basic example assumes the SVG consists of simple line and cubic Bezier 
@@ -459,17 +705,20 @@ def main():
     doc = revit.doc
     app = __revit__.Application
     fam = doc.FamilyManager
-    text = ""
 
-    # get shared parameters
-    sharedParams = {}
+    # get shared parameters, walking the file's groups only once
     sharedParamFile = app.OpenSharedParameterFile()
-    for sg in sharedParamFile.Groups:
-        sgName = sg.Name
-        for sp in sg.Definitions:
-            if sp.Description:
-                sharedParams[sp.Name] = sp
-                text += "[{}] {}\r\n;{}\r\n".format(sp.Name, sp.GUID, sp.Description)
+    described = [
+        sp
+        for sg in sharedParamFile.Groups
+        for sp in sg.Definitions
+        if sp.Description
+    ]
+    sharedParams = {sp.Name: sp for sp in described}
+    text = "".join(
+        "[{}] {}\r\n;{}\r\n".format(sp.Name, sp.GUID, sp.Description)
+        for sp in described
+    )
     forms.alert(text)
 
 
@@ -479,29 +728,51 @@ if EXEC_PARAMS.config_mode:
 else:
     main()
 
-# This script performs flood fill as before, but after filling the region, it uses the findContours function to find the
-# outlines of the filled region. The outlines are returned as a list of contours.
+# This script finds the region containing the point with a single connected components labelling pass instead of a
+# flood fill, then uses the findContours function to find the outlines of that region. The outlines are returned as a
+# list of contours.
 
-# Please note that this function will return multiple contours if the filled region is non-convex or consists of 
+# Please note that this function will return multiple contours if the region is non-convex or consists of 
 # multiple connected components. You may want to choose one or process all of them as per your requirement.
 
-import cv2
-import numpy as np
+# When querying several points of the same color in one image, label the image once with label_regions and pass the
+# labels in, so each further query is just a lookup.
+
+
+def label_regions(img, value):
+    import cv2
+    import numpy as np
+
+    # Label the 4-connected regions of pixels equal to value, all other pixels get label 0
+    _, labels = cv2.connectedComponents((img == value).astype(np.uint8), connectivity=4)
+    return labels
+
 
 # Assuming the input is a binary image.
-def flood_fill_and_outline(img, point):
-    h, w = img.shape[:2]
-    mask = np.zeros((h + 2, w + 2), np.uint8)
+def flood_fill_and_outline(img, point, labels=None):
+    import cv2
+    import numpy as np
 
-    # Perform flood fill
-    cv2.floodFill(img, mask, point, 255, 0, 0, flags=4 | cv2.FLOODFILL_FIXED_RANGE)
+    x, y = point
+    if labels is None:
+        labels = label_regions(img, img[y, x])
+
+    # Pick out the region containing the point. Label 0 is every pixel of a
+    # different value, so labels made for another color cannot be used here.
+    label = labels[y, x]
+    if label == 0:
+        raise ValueError("Point is not in a labelled region, label the image with the color at the point.")
+    region = (labels == label).astype(np.uint8) * 255
 
-    # Find the contours of the filled region
-    contours, hierarchy = cv2.findContours(img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    # Find the contours of the region
+    contours, hierarchy = cv2.findContours(region, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
     return contours
 
 # Usage:
-img = np.zeros((500, 500, 3), np.uint8)
-point = (200, 200)
-contours = flood_fill_and_outline(img, point)
\ No newline at end of file
+if RUN_EXAMPLES:
+    import numpy as np
+
+    img = np.zeros((500, 500), np.uint8)
+    point = (200, 200)
+    contours = flood_fill_and_outline(img, point)
@@ -12,6 +12,7 @@ from System import Guid
 location = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
 UPDATER_TEST = 'create_updater'
+MAX_DIALOG_LINES = 20
 class MyUpdater(IUpdater):
 
     def __init__(self, addinId):
@@ -43,24 +44,31 @@ class MyUpdater(IUpdater):
             t = SubTransaction(up_doc)
             t.Start()
             try:
-                if elems:
-                    for h in elems:
-                        id = up_doc.GetElement(h)
-                        TaskDialog.Show('Element', 'Wall Changed '+str(h)+h)
+                # one dialog for the lot, not one per wall in a paste
+                msgs = ['Wall Changed ' + str(h) for h in elems]
+                if msgs:
+                    text = '\n'.join(msgs[:MAX_DIALOG_LINES])
+                    if len(msgs) > MAX_DIALOG_LINES:
+                        text += '\n... (+%d more)' % (len(msgs) - MAX_DIALOG_LINES)
+                    TaskDialog.Show('Elements', text)
                 t.Commit()
             except:
                 t.RollBack()
 
 app = __revit__.Application
+UPDATER_FILTER = ElementCategoryFilter(BuiltInCategory.OST_Walls)
+#UPDATER_CHANGE = Element.GetChangeTypeGeometry()
+UPDATER_CHANGE = Element.GetChangeTypeElementAddition()
+
 def __selfinit__(script_cmp, ui_button_cmp, __rvt__):
     my_updater = MyUpdater(app.ActiveAddInId)
-    if UpdaterRegistry.IsUpdaterRegistered(my_updater.GetUpdaterId()):
-        UpdaterRegistry.UnregisterUpdater(my_updater.GetUpdaterId())
+    updater_id = my_updater.GetUpdaterId()
+    # already registered by an earlier load of the extension, keep it and
+    # its trigger rather than rebuilding them on every reload
+    if UpdaterRegistry.IsUpdaterRegistered(updater_id):
+        return
     UpdaterRegistry.RegisterUpdater(my_updater)
-    filter = ElementCategoryFilter(BuiltInCategory.OST_Walls)
-    UpdaterRegistry.AddTrigger(my_updater.GetUpdaterId(), filter,
-        #Element.GetChangeTypeGeometry())
-        Element.GetChangeTypeElementAddition())
+    UpdaterRegistry.AddTrigger(updater_id, UPDATER_FILTER, UPDATER_CHANGE)
 
 def togglestate():
 	new_state = not script.get_envvar(UPDATER_TEST)
@@ -2,15 +2,49 @@
 # from pyrevit import script
 # from pyrevit import HOST_APP
 from pyrevit import revit, script, forms
-import wpf, os, clr
+from pyrevit import EXEC_PARAMS
+import wpf, os, clr, threading
+from pattern_math import is_number, render
 
 # .NET Imports
 clr.AddReference("System")
 from System.Windows import Window
-from System import Uri
-from System.Windows.Media.Imaging import BitmapImage
+from System import Action, Uri
+from System.Windows.Media import VisualTreeHelper
+from System.Windows.Media.Imaging import BitmapCacheOption, BitmapImage
 
 PATH_SCRIPT = script.get_script_path()
+PATH_XAML = os.path.join(PATH_SCRIPT, "brickpat.xaml")
+PATH_BRICK_DIMS = os.path.join(PATH_SCRIPT, "brickdims.png")
+PATH_BRICK_PAT = os.path.join(PATH_SCRIPT, "brick.pat")
+
+# Width the palette thumbnails and brick diagram are shown at in the XAML,
+# in device independent units
+THUMBNAIL_WIDTH = 150
+
+# Decoded images by path and decoded width, so each is only read once
+_image_cache = {}
+
+
+def get_image(path, width=None):
+    """Returns the frozen image at path, scaled down to width when given."""
+    key = (path, width)
+    image = _image_cache.get(key)
+    if image is None:
+        image = BitmapImage()
+        image.BeginInit()
+        # decode the whole file now so the file handle is released straight
+        # away, rather than held open while the image is in use
+        image.CacheOption = BitmapCacheOption.OnLoad
+        if width:
+            # only decode the pixels that will be shown
+            image.DecodePixelWidth = width
+        image.UriSource = Uri(path)
+        image.EndInit()
+        # frozen images are shared by the controls showing them, not copied
+        image.Freeze()
+        _image_cache[key] = image
+    return image
 
 
 class BrickForm(Window):
@@ -22,21 +56,19 @@ class BrickForm(Window):
         self.brick_depth = "70"
         self.brick_joint_size = "10"
         self.unit_is_metric = True
+        self.preview_path = None
+        self.thumbnail_decode_width = THUMBNAIL_WIDTH
 
         # Connect to .xaml File (in same folder)
-        path_xaml_file = os.path.join(PATH_SCRIPT, "brickpat.xaml")
-        wpf.LoadComponent(self, path_xaml_file)
+        wpf.LoadComponent(self, PATH_XAML)
 
         # Set defaults
         self.Title = "Brick Input Form"
         self.Width = 450
         self.Height = 650
 
-        brick_dims_uri = Uri(os.path.join(PATH_SCRIPT, "brickdims.png"))
-        self.BrickDims.Source = BitmapImage(brick_dims_uri)
-
-        self.ImagePalette.ItemsSource = self.get_image_thumbnails()
-
+        # images are loaded once the form is on screen
+        self.ContentRendered += self.Window_ContentRendered
 
         self.WidthInput.Text = self.brick_width
         self.HeightInput.Text = self.brick_height
@@ -47,20 +79,81 @@ class BrickForm(Window):
         # Show Form
         self.ShowDialog()
 
+    def Window_ContentRendered(self, sender, e):
+        # raised once, after the first paint, so the form shows without
+        # waiting on image decodes
+        # decode in physical pixels for the display scaling, so the images
+        # stay sharp on 150% and 200% screens
+        dpi_scale = VisualTreeHelper.GetDpi(self).DpiScaleX
+        self.thumbnail_decode_width = int(round(THUMBNAIL_WIDTH * dpi_scale))
+        self.BrickDims.Source = get_image(
+            PATH_BRICK_DIMS, self.thumbnail_decode_width
+        )
+        self.ImagePalette.ItemsSource = self.get_image_thumbnails()
+
     def get_image_thumbnails(self):
         """Returns a list of image thumbnail paths."""
-        brick_dims_uri = Uri(os.path.join(PATH_SCRIPT, "brickdims.png"))
-        return [BitmapImage(brick_dims_uri)]
+        return [get_image(PATH_BRICK_DIMS, self.thumbnail_decode_width)]
 
 
     # <!-- Events --->
     def Thumbnail_MouseLeftButtonDown(self, sender, e):
-        thumbnail = sender.Source
-        # test
-        self.SelectedImage.Source = thumbnail
+        # the thumbnail is decoded small, show the preview at full size
+        path = sender.Source.UriSource.LocalPath
+        if path == self.preview_path:
+            # already shown, or on its way from the worker thread
+            return
+        self.preview_path = path
+        preview = _image_cache.get((path, None))
+        if preview is not None:
+            self.SelectedImage.Source = preview
+            return
+
+        # decode it on a worker thread so the click returns straight away,
+        # the image is frozen so the UI thread can use it as it is
+        def load_preview():
+            try:
+                preview = get_image(path)
+            except Exception as error:
+                # errors on this thread would be lost, report it on the UI
+                # thread so the thumbnail can be clicked again
+                message = str(error)
+                self.Dispatcher.BeginInvoke(
+                    Action(lambda: self.preview_failed(path, message))
+                )
+                return
+            self.Dispatcher.BeginInvoke(
+                Action(lambda: self.show_preview(path, preview))
+            )
+
+        worker = threading.Thread(target=load_preview)
+        worker.daemon = True
+        worker.start()
+
+    def show_preview(self, path, preview):
+        # skip previews that finished after another thumbnail was clicked
+        if path == self.preview_path:
+            self.SelectedImage.Source = preview
+
+    def preview_failed(self, path, message):
+        # let the next click on the thumbnail try again
+        if path == self.preview_path:
+            self.preview_path = None
+        forms.alert("Could not load {}:\n{}".format(path, message))
 
     def SubmitButton_Click(self, sender, e):
         """Handles the submit button click event."""
+        # keep the form open until every dimension is a positive number
+        for label, text_box in (
+            ("Width", self.WidthInput),
+            ("Height", self.HeightInput),
+            ("Depth", self.DepthInput),
+            ("Joint size", self.JointSizeInput),
+        ):
+            if not is_number(text_box.Text) or float(text_box.Text) <= 0:
+                forms.alert("{} must be a positive number.".format(label))
+                return
+
         self.brick_height = self.HeightInput.Text
         self.brick_width = self.WidthInput.Text
         self.brick_depth = self.DepthInput.Text
@@ -70,149 +163,13 @@ class BrickForm(Window):
         self.Close()
 
 
-def is_number(n):
-    is_number = True
-    try:
-        num = float(n)
-        # check for "nan" floats
-        is_number = num == num
-    except ValueError:
-        is_number = False
-    return is_number
-
-
-def to_number(s):
-    try:
-        return int(s)
-    except ValueError:
-        return float(s)
-
-
-def eval_math(formula):
-    if isinstance(formula, list) and len(formula) == 1:
-        if is_number(formula[0]):
-            return to_number(formula[0])
-        else:
-            raise Exception("Could not evaluate formula")
-    elif isinstance(formula, (int, float)):
-        return formula
-    elif len(formula) < 3:
-        raise Exception("Could not evaluate formula")
-    if "+" in formula:
-        operator_pos = formula.index("+")
-        return eval_math(formula[:operator_pos]) + eval_math(
-            formula[operator_pos + 1 :]
-        )
-    if "-" in formula:
-        operator_pos = formula.index("-")
-        return eval_math(formula[:operator_pos]) - eval_math(
-            formula[operator_pos + 1 :]
-        )
-    if "*" in formula:
-        operator_pos = formula.index("*")
-        return eval_math(formula[:operator_pos]) * eval_math(
-            formula[operator_pos + 1 :]
-        )
-    if "/" in formula:
-        operator_pos = formula.index("/")
-        return eval_math(formula[:operator_pos]) / eval_math(
-            formula[operator_pos + 1 :]
-        )
-    raise Exception("Could not evaluate formula")
-
-
-def eval_math_str(formula):
-    # split formula into tokens: numbers, operators, nested formulae
-    operators = set(["+", "-", "*", "/"])
-    digits = ".0123456789"
-    tokens = []
-    curr_pos = 0
-    while curr_pos < len(formula):
-        c = formula[curr_pos : curr_pos + 1]
-        c1 = formula[curr_pos + 1 : curr_pos + 2]
-        if c == " ":
-            curr_pos += 1  # skip white space
-        elif c in digits or (c == "-" and c1 in digits and last_type == "operator"):
-            span = 2 if c == "-" else 1
-            number = formula[curr_pos : curr_pos + span]
-            number_valid = True
-            while number_valid:
-                if is_number(
-                    formula[curr_pos : curr_pos + span + 1]
-                ) and curr_pos + span < len(formula):
-                    span += 1
-                else:
-                    number_valid = False
-            tokens.append(formula[curr_pos : curr_pos + span].strip())
-            last_type = "number"
-            curr_pos += span
-        elif c in operators:
-            tokens.append(c)
-            last_type = "operator"
-            curr_pos += 1
-        elif c == "(":
-            nest_level = 1
-            span = 1
-            while nest_level != 0:
-                if c1 == "(":
-                    nest_level += 1
-                elif c1 == ")":
-                    nest_level -= 1
-                c1 = formula[curr_pos + span + 1 : curr_pos + span + 2]
-                span += 1
-                if curr_pos + span > len(formula):
-                    raise Exception("Could not resolve nested brackets")
-            # also tokenise nested formulae
-            nested_formula = formula[curr_pos + 1 : curr_pos + span - 1]
-            tokens.append(eval_math_str(nested_formula))
-            last_type = "number"
-            curr_pos += span
-        else:
-            curr_pos += 1
-
-    # return if we have just a number
-    if len(tokens) == 1:
-        if is_number(tokens[0]):
-            return to_number(tokens[0])
-        else:
-            raise Exception("Could not evaluate formula")
-    elif len(tokens) < 3:
-        raise Exception("Could not evaluate formula")
-
-    # or evaluate the formula
-    result = str(round(eval_math(tokens), 6))
-    result = result.rstrip("0").rstrip(".") if "." in result else result
-    return result
-
-
-def do_math(text):
-    level = 0
-    return_text = ""
-    curr_math = ""
-    for t in text:
-        if t == "(":
-            level += 1
-            curr_math += t
-        elif t == ")" and level > 0:
-            level -= 1
-            curr_math += t
-            if level == 0:
-                return_text += str(eval_math_str(curr_math))
-                curr_math = ""
-        elif level > 0:
-            curr_math += t
-        else:
-            return_text += t
-    return return_text
-
-
 template = """;%UNITS={units}
 
 *BRICK_{width}x{height}x{mortar}ENGLISH_SL_WM,English bond {width} x {height}mm brick with {mortar}mm mortar - single line version
 ;%TYPE=MODEL
-0,0,({height}+{mortar}/2),0,({height}+{mortar})
-90,({width}-({width}+{mortar})/4-{mortar}/2),({height}*2+{mortar}*1.5),0,({width}+{mortar}),({height}+{mortar}),-({height}+{mortar})
-90,({width}/2),({height}+{mortar}/2),0,({width}/2+{mortar}/2),({height}+{mortar}),-({height}+{mortar})
+0,0,(height+mortar/2),0,(height+mortar)
+90,(width-(width+mortar)/4+mortar/2),(height*2+mortar*1.5),0,(width+mortar),(height+mortar),-(height+mortar)
+90,(width/2),(height+mortar/2),0,(width/2+mortar/2),(height+mortar),-(height+mortar)
 """
 
 
@@ -223,25 +180,53 @@ def make_brick_pattern():
     # Show form to the user
     UI = BrickForm()
 
-    # Get User Input
+    # Get User Input, the formulas in the template work on the dimensions
+    # as numbers
     brick = {
-        "width": UI.brick_width,
-        "height": UI.brick_height,
-        "depth": UI.brick_depth,
-        "mortar": UI.brick_joint_size,
+        "width": float(UI.brick_width),
+        "height": float(UI.brick_height),
+        "depth": float(UI.brick_depth),
+        "mortar": float(UI.brick_joint_size),
         "units": "MM" if UI.unit_is_metric else "IMPERIAL",
     }
 
     # Generate pattern
     print("Selected pattern = {}".format(str(UI.SelectedImage.Source)))
-    pattern = template.format(**brick)
-    print(pattern)
-    pattern = do_math(pattern)
+    pattern = render(template, brick)
     print(pattern)
 
 
+def check_template():
+    """Checks the template against the 230 x 76 x 10 pattern in brick.pat."""
+    brick = {
+        "width": 230.0,
+        "height": 76.0,
+        "depth": 70.0,
+        "mortar": 10.0,
+        "units": "MM",
+    }
+    # the template's lines from the pattern name on, as brick.pat has them
+    expected = render(template, brick).splitlines()[2:]
+    with open(PATH_BRICK_PAT) as pat_file:
+        lines = pat_file.read().splitlines()
+    start = lines.index(expected[0])
+    found = lines[start : start + len(expected)]
+    if found == expected:
+        forms.alert("Template matches brick.pat.")
+    else:
+        forms.alert(
+            "Template does not match brick.pat:\n\n{}\n\nexpected:\n\n{}".format(
+                "\n".join(found), "\n".join(expected)
+            )
+        )
+
+
 if __name__ == "__main__":
-    make_brick_pattern()
+    if EXEC_PARAMS.config_mode:
+        # Check the template (shift-click)
+        check_template()
+    else:
+        make_brick_pattern()
 
 
 # import clr
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Arithmetic for hatch pattern templates.
+
+render fills in a pattern template's {fields} and replaces each top level
+bracketed formula with its value, names in the formulas are looked up in
+the same values as the fields.
+"""
+import ast
+import operator
+import re
+import string
+
+# Number literals parse to ast.Constant on Python 3 and ast.Num on IronPython
+try:
+    _NUMBER_NODE, _NUMBER_FIELD = ast.Constant, "value"
+except AttributeError:
+    _NUMBER_NODE, _NUMBER_FIELD = ast.Num, "n"
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# A plain decimal number as typed into a form
+_NUMBER_TEXT = re.compile(r"\s*-?\d+(\.\d+)?\s*$")
+
+
+def is_number(n):
+    """Returns True for a number or text that float() reads as one."""
+    if isinstance(n, (int, float)):
+        # check for "nan" floats
+        return n == n
+    if isinstance(n, str) and _NUMBER_TEXT.match(n) is not None:
+        return True
+    # anything else the regex does not cover, such as ".375" or "1e3"
+    try:
+        num = float(n)
+    except (TypeError, ValueError):
+        return False
+    return num == num
+
+
+# Steps of a parsed formula, run in order against a stack of values
+_NUMBER, _NAME, _UNARY, _BINARY = range(4)
+
+
+def _compile_math(node, program):
+    # append the steps for the expression to program in postfix order, each
+    # operator after the operands it works on
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        _compile_math(node.left, program)
+        _compile_math(node.right, program)
+        program.append((_BINARY, _BINARY_OPERATORS[type(node.op)]))
+    elif isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        _compile_math(node.operand, program)
+        program.append((_UNARY, _UNARY_OPERATORS[type(node.op)]))
+    elif isinstance(node, ast.Name):
+        program.append((_NAME, node.id))
+    elif isinstance(node, _NUMBER_NODE) and type(
+        getattr(node, _NUMBER_FIELD)
+    ) in (int, float):
+        program.append((_NUMBER, getattr(node, _NUMBER_FIELD)))
+    else:
+        raise Exception("Could not evaluate formula")
+    return program
+
+
+def eval_math(program, names=None):
+    """Evaluates a parsed formula, names are looked up in the bindings given."""
+    stack = []
+    for step, arg in program:
+        if step == _NUMBER:
+            stack.append(arg)
+        elif step == _NAME:
+            if not names or arg not in names:
+                raise Exception("Could not evaluate formula")
+            stack.append(names[arg])
+        elif step == _UNARY:
+            stack.append(arg(stack.pop()))
+        else:
+            right = stack.pop()
+            stack.append(arg(stack.pop(), right))
+    return stack[0]
+
+
+# Parsed formulas by their text, the template repeats several of them
+_formula_cache = {}
+
+
+def parse_math(formula):
+    # let Python's own parser tokenise the formula and honour precedence,
+    # only the arithmetic nodes are evaluated so nothing else can run
+    program = _formula_cache.get(formula)
+    if program is None:
+        try:
+            expression = ast.parse(formula, mode="eval").body
+        except SyntaxError:
+            raise Exception("Could not evaluate formula")
+        program = _formula_cache[formula] = _compile_math(expression, [])
+    return program
+
+
+def format_number(value):
+    if isinstance(value, int):
+        return str(value)
+    # %g drops trailing zeros and a bare decimal point itself, 15 significant
+    # digits keep every decimal round leaves for the sizes patterns use
+    return "%.15g" % round(value, 6)
+
+
+def split_math(text):
+    """Splits text into its plain runs and its parsed top level formulas.
+
+    The runs are the text before, between and after the bracketed
+    formulas, so there is always one more run than there are formulas.
+    """
+    runs = []
+    formulas = []
+    curr_pos = 0
+    while True:
+        start = text.find("(", curr_pos)
+        if start < 0:
+            runs.append(text[curr_pos:])
+            return runs, formulas
+        runs.append(text[curr_pos:start])
+        # jump from bracket to bracket to find the one closing this formula
+        level = 1
+        end = start + 1
+        while level:
+            close = text.find(")", end)
+            if close < 0:
+                raise Exception("Could not resolve nested brackets")
+            open_ = text.find("(", end, close)
+            if open_ < 0:
+                level -= 1
+                end = close + 1
+            else:
+                level += 1
+                end = open_ + 1
+        formulas.append(parse_math(text[start:end]))
+        curr_pos = end
+
+
+# Steps of a template plan
+_TEXT, _FIELD, _FORMULA = range(3)
+
+
+def plan_template(template):
+    """Splits a template into the steps render follows, in order.
+
+    Each step is a run of plain text, a {field} with its format spec or a
+    parsed bracketed formula.
+    """
+    runs, formulas = split_math(template)
+    plan = []
+    for run, formula in zip(runs, formulas + [None]):
+        for text, field, spec, conversion in string.Formatter().parse(run):
+            if text:
+                plan.append((_TEXT, text))
+            if field is not None:
+                if conversion:
+                    raise Exception("Could not fill field {}".format(field))
+                plan.append((_FIELD, (field, spec)))
+        if formula is not None:
+            plan.append((_FORMULA, formula))
+    return plan
+
+
+# Template plans by their text, so a template is only scanned and parsed
+# the first time it is used
+_plan_cache = {}
+
+
+def render(template, values):
+    """Fills in a template's {fields} and formulas from values.
+
+    Numbers in fields are written the same way as formula results, so a
+    field and a formula with the same value read the same in the pattern.
+    """
+    plan = _plan_cache.get(template)
+    if plan is None:
+        plan = _plan_cache[template] = plan_template(template)
+    results = {}
+    parts = []
+    for step, arg in plan:
+        if step == _TEXT:
+            parts.append(arg)
+        elif step == _FIELD:
+            field, spec = arg
+            value = values[field]
+            if spec:
+                parts.append(format(value, spec))
+            elif isinstance(value, (int, float)):
+                parts.append(format_number(value))
+            else:
+                parts.append(str(value))
+        else:
+            # a repeated formula shares its parsed program, so each distinct
+            # one is only evaluated and formatted once per call
+            value = results.get(id(arg))
+            if value is None:
+                value = results[id(arg)] = format_number(eval_math(arg, values))
+            parts.append(value)
+    return "".join(parts)